@@ -15,27 +15,59 @@
 #
 # Nota: le parti core originali sono state mantenute/riorganizzate. Interfaccia sempre interattiva, con nuove flag CLI opzionali.
 
+import errno
+import io
 import os
+import re
 import sys
+import time
 import subprocess
 import json
 from pathlib import Path
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 import hashlib
+import mmap
 import shutil
+import threading
+from array import array
+from functools import lru_cache
 from heapq import nsmallest
-from collections import defaultdict
-from typing import Dict, List, Tuple, Iterable, Any, Optional
+from collections import defaultdict, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Tuple, Iterable, Any, Optional, Union
 import argparse
+import queue
 import tempfile
 
+# Hash veloce opzionale: BLAKE3 (SIMD + multithread) se installato, altrimenti SHA-1.
+try:
+    import blake3  # pip install blake3
+except ImportError:
+    blake3 = None
+
+# NumPy opzionale: su librerie enormi (>100k file) argsort/argpartition sugli
+# mtime battono sort()/nsmallest puri Python. Senza NumPy si usa il fallback.
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 # ----------------------------
 # Config di base (sovrascrivibili da CLI)
 # ----------------------------
-PHOTO_EXT = {".jpg", ".jpeg", ".png", ".heic", ".heif", ".dng", ".nef", ".cr2", ".cr3", ".arw", ".rw2", ".orf"}
-VIDEO_EXT = {".mp4", ".mov", ".m4v", ".avi", ".mts", ".m2ts", ".3gp", ".mkv"}  # (6) aggiunto .mkv
+# frozenset: lookup leggermente più rapido e niente rischio di mutazioni accidentali
+PHOTO_EXT = frozenset({".jpg", ".jpeg", ".png", ".heic", ".heif", ".dng", ".nef", ".cr2", ".cr3", ".arw", ".rw2", ".orf"})
+VIDEO_EXT = frozenset({".mp4", ".mov", ".m4v", ".avi", ".mts", ".m2ts", ".3gp", ".mkv"})  # (6) aggiunto .mkv
 ALL_EXT = PHOTO_EXT | VIDEO_EXT
-SIDECAR_EXT = {".aae", ".xmp", ".thm", ".lrv"}
+SIDECAR_EXT = frozenset({".aae", ".xmp", ".thm", ".lrv"})
+
+
+def _ext_lower(name: str) -> str:
+    """Estensione minuscola via rfind: stesso risultato di
+    os.path.splitext(name)[1].lower() per i nomi reali, ma senza tupla
+    intermedia né dispatch generico (conta nei loop di scansione)."""
+    dot = name.rfind(".")
+    return name[dot:].lower() if dot > 0 else ""
 
 DATE_KEYS = [
     "SubSecDateTimeOriginal", "DateTimeOriginal",
@@ -52,10 +84,16 @@ DUP_SCAN_JSONL = "dup_scan.jsonl"          # (8)
 DUP_ACTION_LOG = "duplicati_action.txt"
 DUP_ACTIONS_JSONL = "dup_actions.jsonl"     # (8)
 CONFIG_FILE = "exiftool_path.txt"
+EXIFTOOL_CONFIG_FILE = "exiftool_pickeddate.config"
 CHECKPOINT_FILE = "organize_checkpoint.json"  # (9)
+EXIF_DATE_CACHE_FILE = "exif_date_cache.json"  # cache date metadata fra run
 
-BATCH_EXIF_SIZE = 25
+BATCH_EXIF_SIZE = 200  # con exiftool persistente (-stay_open) il costo per chiamata è minimo
 PARTIAL_HASH_BYTES = 4 * 1024 * 1024  # 4MB per pre-hash
+TINY_HASH_BYTES = 4096  # primo livello della cascata: header/EXIF divergono quasi subito
+HEAD_TAIL_BYTES = 64 * 1024  # prefiltro testa+coda nel confronto src/dest
+CHECKPOINT_EVERY = 50    # checkpoint ogni N file (o ogni CHECKPOINT_SECS), non ad ogni file
+CHECKPOINT_SECS = 2.0
 
 # Opzioni (alcune sovrascrivibili via CLI)
 WARN_ON_MTIME = True
@@ -64,6 +102,10 @@ NORMALIZE_TO_LOCAL = False   # default (5)
 NORMALIZE_TO_UTC = False    # (5)
 QUICKTIME_UTC = False        # Nuovo: se True, forza -api QuickTimeUTC (disattivo di default)
 USE_SHELL_FALLBACK = True   # (10)
+EXIF_CONFIG_PATH: Optional[str] = None  # config exiftool con tag composito PickedDate (vedi sotto)
+QUIET = False                # --quiet: sopprime le righe per-file, restano errori e riepiloghi
+FFPROBE_WORKERS = 0          # --ffprobe-workers: 0 = automatico (cpu_count)
+EXIF_WORKERS = 0             # --exif-workers: demoni exiftool paralleli (0 = automatico)
 
 # ----------------------------
 # CLI
@@ -73,13 +115,19 @@ def parse_args():
     ap = argparse.ArgumentParser(description="Organizza foto/video e gestisce duplicati.")
     ap.add_argument("--no-local-tz", action="store_true", help="Non normalizzare le date al fuso locale.")
     ap.add_argument("--utc", action="store_true", help="Normalizza le date a UTC (sovrascrive --no-local-tz).")
-    ap.add_argument("--batch-exif", type=int, default=BATCH_EXIF_SIZE, help="Dimensione batch lettura EXIF (default 25).")
+    ap.add_argument("--batch-exif", type=int, default=BATCH_EXIF_SIZE, help="Dimensione batch lettura EXIF (default 200).")
     ap.add_argument("--prehash-bytes", type=int, default=PARTIAL_HASH_BYTES, help="Dimensione pre-hash in byte (default 4MB).")
     ap.add_argument("--no-shell-fallback", action="store_true", help="Disabilita fallback shell=True (Windows).")
     ap.add_argument("--disable-near-dup", action="store_true",
                     help="Disattiva il rilevamento dei duplicati quasi uguali per i video (di default è ATTIVO; richiede ffprobe).")
     ap.add_argument("--qt-utc", action="store_true",
                     help="Usa -api QuickTimeUTC in exiftool (per trattare i tempi QuickTime come UTC).")
+    ap.add_argument("--quiet", action="store_true",
+                    help="Sopprime le righe di log per singolo file (errori e riepiloghi restano).")
+    ap.add_argument("--ffprobe-workers", type=int, default=0,
+                    help="Thread paralleli per ffprobe nei near-duplicates (0 = automatico).")
+    ap.add_argument("--exif-workers", type=int, default=0,
+                    help="Demoni exiftool paralleli per i batch di date (0 = automatico, max 4).")
     return ap.parse_args()
 
 # ----------------------------
@@ -128,25 +176,266 @@ def get_exiftool_path(base: Path) -> Optional[str]:
 # Utilità
 # ----------------------------
 
-def file_sha1(p: Path, bufsize: int = 1024 * 1024) -> str:
-    h = hashlib.sha1()
-    with p.open("rb") as f:
-        for chunk in iter(lambda: f.read(bufsize), b""):
-            h.update(chunk)
-    return h.hexdigest()
-
-
-def file_sha1_head(p: Path, max_bytes: int) -> str:
-    h = hashlib.sha1()
-    read = 0
-    with p.open("rb") as f:
-        while read < max_bytes:
-            chunk = f.read(min(1024 * 1024, max_bytes - read))
-            if not chunk:
+# Log bufferizzato: i print sincroni per ogni file (2-4 righe × decine di
+# migliaia di file) diventano un collo di bottiglia, specie sulla console
+# Windows. Le righe si accumulano e si scrivono a blocchi.
+_LOG_BUF: List[str] = []
+_LOG_LOCK = threading.Lock()
+_LOG_CAPACITY = 200
+_LOG_FLUSH_SECS = 1.0  # flush anche a tempo: il progresso resta visibile
+_LOG_LAST_FLUSH = 0.0
+
+
+def log_line(msg: str, per_file: bool = False):
+    """Accoda una riga di log (flush a blocchi). per_file=True marca le righe
+    soppresse da --quiet; errori e riepiloghi passano sempre."""
+    if per_file and QUIET:
+        return
+    with _LOG_LOCK:
+        _LOG_BUF.append(msg)
+        if len(_LOG_BUF) >= _LOG_CAPACITY or time.monotonic() - _LOG_LAST_FLUSH > _LOG_FLUSH_SECS:
+            _flush_log_locked()
+
+
+def _flush_log_locked():
+    global _LOG_LAST_FLUSH
+    _LOG_LAST_FLUSH = time.monotonic()
+    if _LOG_BUF:
+        sys.stdout.write("\n".join(_LOG_BUF) + "\n")
+        sys.stdout.flush()
+        _LOG_BUF.clear()
+
+
+def flush_log():
+    with _LOG_LOCK:
+        _flush_log_locked()
+
+
+HASH_ALGO = "blake3" if blake3 is not None else "sha1"
+
+
+def _new_hash():
+    """Hash per il fingerprinting dei duplicati: BLAKE3 se disponibile, fallback SHA-1.
+    Gli hash sono identificatori interni (mai esportati), quindi l'algoritmo è intercambiabile."""
+    if blake3 is not None:
+        return blake3.blake3(max_threads=blake3.AUTO)
+    return hashlib.sha1()
+
+
+def _fadvise(fd: int, advice: int):
+    """Hint al kernel sul pattern di accesso (solo POSIX): no-op altrove."""
+    try:
+        os.posix_fadvise(fd, 0, 0, advice)
+    except (AttributeError, OSError):
+        pass
+
+
+def _drop_page_cache(p: Union[str, Path]):
+    """Dopo un full hash il file non verrà riletto: POSIX_FADV_DONTNEED evita
+    che gigabyte di video sfrattino dalla page cache dati ancora utili."""
+    if not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        fd = os.open(os.fspath(p), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+# Oltre questa soglia niente mmap monolitico: mappare decine di GB di video
+# in un colpo solo stressa address space e page cache, meglio il loop chunked.
+_MMAP_MAX_BYTES = 256 * 1024 * 1024
+
+
+def file_fingerprint(p: Union[str, Path], bufsize: int = 8 * 1024 * 1024) -> bytes:
+    h = _new_hash()
+    if blake3 is not None and hasattr(h, "update_mmap"):
+        # BLAKE3: hashing mmap multithread interno, niente loop Python
+        h.update_mmap(os.fspath(p))
+        _drop_page_cache(p)
+        return h.digest()
+    size = os.stat(p).st_size
+    if bufsize < size <= _MMAP_MAX_BYTES:
+        # mmap: l'hash legge direttamente dalla page cache in un'unica update
+        # (il GIL resta rilasciato per tutto il file), zero copie Python
+        with open(p, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(os, "posix_fadvise"):
+                _fadvise(f.fileno(), os.POSIX_FADV_SEQUENTIAL)
+                # WILLNEED in aggiunta: il readahead parte subito invece di
+                # aspettare i primi page fault del mmap
+                _fadvise(f.fileno(), os.POSIX_FADV_WILLNEED)
+            h.update(mm)
+            if hasattr(os, "posix_fadvise"):
+                _fadvise(f.fileno(), os.POSIX_FADV_DONTNEED)
+    elif hasattr(hashlib, "file_digest"):
+        # Py>=3.11: loop readinto zero-copy implementato in C
+        with open(p, "rb", buffering=0) as f:
+            if size > _MMAP_MAX_BYTES and hasattr(os, "posix_fadvise"):
+                _fadvise(f.fileno(), os.POSIX_FADV_SEQUENTIAL)
+            h = hashlib.file_digest(f, _new_hash)
+            if size > _MMAP_MAX_BYTES and hasattr(os, "posix_fadvise"):
+                _fadvise(f.fileno(), os.POSIX_FADV_DONTNEED)
+            return h.digest()
+    else:
+        # Py < 3.11 senza file_digest: loop a blocchi, mai l'intero file in
+        # memoria (un video sopra il tetto mmap arriverebbe qui intero)
+        with open(p, "rb") as f:
+            if size > _MMAP_MAX_BYTES and hasattr(os, "posix_fadvise"):
+                _fadvise(f.fileno(), os.POSIX_FADV_SEQUENTIAL)
+            while True:
+                data = f.read(bufsize)
+                if not data:
+                    break
+                h.update(data)
+    return h.digest()
+
+
+def file_fingerprint_tiny(p: Union[str, Path], n_bytes: int = TINY_HASH_BYTES) -> bytes:
+    """Hash dei primi 4 KB letti con os.open/os.read (niente IO bufferizzato):
+    la stragrande maggioranza dei file non identici diverge già nell'header,
+    quindi questo livello elimina quasi tutti i gruppi con un solo settore."""
+    fd = os.open(p, os.O_RDONLY)
+    try:
+        data = os.read(fd, n_bytes)
+    finally:
+        os.close(fd)
+    h = _new_hash()
+    h.update(data)
+    return h.digest()
+
+
+def file_fingerprint_head_tail(p: Union[str, Path], n_bytes: int = HEAD_TAIL_BYTES) -> bytes:
+    """Hash di testa e coda (n_bytes ciascuna): due pread contro la lettura
+    intera. File diversi ma di pari dimensione divergono quasi sempre in uno
+    dei due estremi (header EXIF riscritti, trailer/atom dei container)."""
+    fd = os.open(p, os.O_RDONLY)
+    try:
+        size = os.fstat(fd).st_size
+        h = _new_hash()
+        if hasattr(os, "pread"):
+            h.update(os.pread(fd, n_bytes, 0))
+            if size > n_bytes:
+                h.update(os.pread(fd, n_bytes, max(n_bytes, size - n_bytes)))
+        else:
+            # Windows: niente pread, seek espliciti sullo stesso fd
+            h.update(os.read(fd, n_bytes))
+            if size > n_bytes:
+                os.lseek(fd, max(n_bytes, size - n_bytes), os.SEEK_SET)
+                h.update(os.read(fd, n_bytes))
+        return h.digest()
+    finally:
+        os.close(fd)
+
+
+# Buffer riusato per thread dal pre-hash: evita di allocare bytes nuovi
+# ad ogni file (il pool di hashing gira su più thread, da cui il local()).
+_HEAD_BUF = threading.local()
+
+# LRU dei digest completi per identità file (dev, inode, size, mtime_ns):
+# sidecar e destinazioni ricontrollate in run ripetuti (o dentro lo stesso
+# shard) non vengono rilette da disco. Il rename conserva inode e contenuto,
+# quindi le voci restano valide anche dopo un move.
+_DIGEST_CACHE: "OrderedDict[Tuple[int, int, int, int], bytes]" = OrderedDict()
+_DIGEST_CACHE_MAX = 4096
+_DIGEST_CACHE_LOCK = threading.Lock()
+
+
+def file_fingerprint_cached(p: Union[str, Path]) -> bytes:
+    try:
+        st = os.stat(p)
+        key = (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+    except OSError:
+        return file_fingerprint(p)
+    with _DIGEST_CACHE_LOCK:
+        hit = _DIGEST_CACHE.get(key)
+        if hit is not None:
+            _DIGEST_CACHE.move_to_end(key)
+            return hit
+    dig = file_fingerprint(p)
+    with _DIGEST_CACHE_LOCK:
+        _DIGEST_CACHE[key] = dig
+        if len(_DIGEST_CACHE) > _DIGEST_CACHE_MAX:
+            _DIGEST_CACHE.popitem(last=False)
+    return dig
+
+
+# Pool per il confronto src/dest nel loop organize: due letture complete in
+# parallelo invece che in serie (read() e gli update C di hashlib rilasciano
+# il GIL). Lazy: i run di sola scansione duplicati non ne hanno bisogno.
+_PAIR_HASH_POOL: Optional[ThreadPoolExecutor] = None
+
+
+def _pair_hash(fn, a, b, *extra) -> Tuple[bytes, bytes]:
+    """Calcola fn(a, *extra) e fn(b, *extra) in parallelo e ritorna i digest."""
+    global _PAIR_HASH_POOL
+    if _PAIR_HASH_POOL is None:
+        # 4 worker: con i move shardati più coppie possono arrivare insieme
+        _PAIR_HASH_POOL = ThreadPoolExecutor(max_workers=4)
+    fa = _PAIR_HASH_POOL.submit(fn, a, *extra)
+    fb = _PAIR_HASH_POOL.submit(fn, b, *extra)
+    return fa.result(), fb.result()
+
+
+class _LimitedReader:
+    """File-like minimale che limita la lettura ai primi max_bytes: consente
+    di dare un prefisso in pasto a hashlib.file_digest (loop readinto in C)
+    quando il mmap del prefisso non è disponibile."""
+
+    def __init__(self, f, max_bytes: int):
+        self._f = f
+        self._left = max_bytes
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        if self._left <= 0:
+            return 0
+        if len(b) > self._left:
+            b = memoryview(b)[:self._left]
+        n = self._f.readinto(b) or 0
+        self._left -= n
+        return n
+
+
+def file_fingerprint_head(p: Union[str, Path], max_bytes: int) -> bytes:
+    h = _new_hash()
+    with open(p, "rb", buffering=0) as f:
+        if hasattr(os, "posix_fadvise"):
+            # solo SEQUENTIAL: niente DONTNEED, il file potrebbe essere
+            # riletto per intero al livello successivo della cascata
+            _fadvise(f.fileno(), os.POSIX_FADV_SEQUENTIAL)
+        size = os.fstat(f.fileno()).st_size
+        length = min(size, max_bytes)
+        if length:
+            try:
+                # mmap del solo prefisso: una update senza copie intermedie
+                with mmap.mmap(f.fileno(), length, access=mmap.ACCESS_READ) as mm:
+                    h.update(mm)
+                return h.digest()
+            except (ValueError, OSError):
+                pass  # fs senza mmap: fallback sotto
+        if hasattr(hashlib, "file_digest"):
+            # Py>=3.11: loop C anche nel fallback, limitato al prefisso
+            return hashlib.file_digest(_LimitedReader(f, max_bytes), _new_hash).digest()
+        buf = getattr(_HEAD_BUF, "buf", None)
+        if buf is None or len(buf) < max_bytes:
+            buf = bytearray(max_bytes)
+            _HEAD_BUF.buf = buf
+        mv = memoryview(buf)
+        total = 0
+        while total < max_bytes:
+            n = f.readinto(mv[total:max_bytes])
+            if not n:
                 break
-            h.update(chunk)
-            read += len(chunk)
-    return h.hexdigest()
+            total += n
+        h.update(mv[:total])
+    return h.digest()
 
 
 def _to_str_values(v: Any) -> List[str]:
@@ -159,12 +448,76 @@ def _to_str_values(v: Any) -> List[str]:
     return [str(v)]
 
 
+def _parse_date_fast(s: str) -> Optional[datetime]:
+    """Percorso rapido per il formato imposto a exiftool ('%Y:%m:%d %H:%M:%S%z'):
+    slicing a offset fissi invece di strptime (molto lento in CPython).
+    Accetta separatori ':' o '-' e offset '+HHMM' oppure '+HH:MM'."""
+    n = len(s)
+    if n not in (19, 24, 25):
+        return None
+    if s[4] != s[7] or s[4] not in ":-" or s[10] != " " or s[13] != ":" or s[16] != ":":
+        return None
+    try:
+        y = int(s[0:4]); mo = int(s[5:7]); d = int(s[8:10])
+        hh = int(s[11:13]); mi = int(s[14:16]); ss = int(s[17:19])
+        tz = None
+        if n > 19:
+            sign = s[19]
+            if sign not in "+-":
+                return None
+            if n == 25 and s[22] == ":":
+                oh, om = int(s[20:22]), int(s[23:25])
+            elif n == 24:
+                oh, om = int(s[20:22]), int(s[22:24])
+            else:
+                return None
+            delta = timedelta(hours=oh, minutes=om)
+            tz = timezone(-delta if sign == "-" else delta)
+        return datetime(y, mo, d, hh, mi, ss, tzinfo=tz)
+    except ValueError:
+        return None
+
+
+# Livello intermedio: una sola regex compilata per le varianti con
+# subsecondi o 'T' che il percorso a offset fissi non copre, prima di
+# cadere nel loop strptime (molto più lento).
+_DT_RE = re.compile(
+    r"^(\d{4})[:\-](\d{2})[:\-](\d{2})[ T](\d{2}):(\d{2}):(\d{2})"
+    r"(?:\.(\d+))?(Z|[+\-]\d{2}:?\d{2})?$")
+
+
+@lru_cache(maxsize=64)
+def _tz_from_suffix(tzs: str) -> Optional[timezone]:
+    """Offset tz dal suffisso ('Z', '+HHMM' o '+HH:MM'). Gli offset reali sono
+    una manciata: la lru_cache li costruisce una volta sola."""
+    if tzs == "Z":
+        return timezone.utc
+    digits = tzs[1:].replace(":", "")
+    delta = timedelta(hours=int(digits[:2]), minutes=int(digits[2:4]))
+    return timezone(-delta if tzs[0] == "-" else delta)
+
+
 def parse_date_string(s: str):
     if not s:
         return None
     s = s.strip()
     if s.endswith("Z"):
         s = s[:-1] + "+00:00"
+    dt = _parse_date_fast(s)
+    if dt is not None:
+        return dt
+    m = _DT_RE.match(s)
+    if m:
+        try:
+            frac = m.group(7)
+            us = int(frac[:6].ljust(6, "0")) if frac else 0
+            tzs = m.group(8)
+            return datetime(int(m.group(1)), int(m.group(2)), int(m.group(3)),
+                            int(m.group(4)), int(m.group(5)), int(m.group(6)),
+                            us, tzinfo=_tz_from_suffix(tzs) if tzs else None)
+        except ValueError:
+            pass
+    # Fallback per formati meno comuni
     formats = (
         "%Y:%m:%d %H:%M:%S%z",
         "%Y:%m:%d %H:%M:%S",
@@ -185,6 +538,11 @@ def parse_date_string(s: str):
 
 # (5) Normalizzazione tempo
 
+# Il fuso locale non cambia durante la sessione: lo si calcola una volta sola
+# invece di rifare datetime.now().astimezone() per ogni file.
+_LOCAL_TZINFO = datetime.now().astimezone().tzinfo
+
+
 def _normalize_dt(dt: datetime) -> datetime:
     if NORMALIZE_TO_UTC:
         if dt.tzinfo is None:
@@ -193,7 +551,7 @@ def _normalize_dt(dt: datetime) -> datetime:
     if NORMALIZE_TO_LOCAL:
         try:
             if dt.tzinfo is not None and dt.tzinfo.utcoffset(dt) is not None:
-                return dt.astimezone(datetime.now().astimezone().tzinfo)
+                return dt.astimezone(_LOCAL_TZINFO)
         except Exception:
             pass
     return dt
@@ -203,32 +561,19 @@ def _normalize_dt(dt: datetime) -> datetime:
 # ----------------------------
 
 def _run_cmd_robust(cmd_list: List[str]) -> subprocess.CompletedProcess:
-    """Prova prima senza shell. Se PermissionError/WinError 5 e consentito, riprova con shell=True."""
+    """Prova prima senza shell. Se PermissionError/WinError 5 e consentito, riprova con shell=True.
+
+    Le liste file lunghe viaggiano sempre via -@ argfile (o stdin del demone),
+    quindi la riga di comando resta corta anche sotto il limite argv di
+    Windows e il quoting del fallback è banale."""
     try:
         return subprocess.run(cmd_list, capture_output=True, text=True)
-    except PermissionError as e:
-        winerr = getattr(e, "winerror", None)
-        if os.name == "nt" and winerr == 5 and USE_SHELL_FALLBACK:
-            # Fallback via cmd.exe
-            quoted = []
-            for tok in cmd_list:
-                if " " in tok or "\\" in tok or ":" in tok:
-                    quoted.append(f'"{tok}"')
-                else:
-                    quoted.append(tok)
-            cmdline = " ".join(quoted)
-            return subprocess.run(cmdline, capture_output=True, text=True, shell=True)
-        raise
     except OSError as e:
+        # PermissionError è una sottoclasse di OSError: un solo ramo basta.
         winerr = getattr(e, "winerror", None)
         if os.name == "nt" and winerr == 5 and USE_SHELL_FALLBACK:
-            quoted = []
-            for tok in cmd_list:
-                if " " in tok or "\\" in tok or ":" in tok:
-                    quoted.append(f'"{tok}"')
-                else:
-                    quoted.append(tok)
-            cmdline = " ".join(quoted)
+            # Fallback via cmd.exe, con il quoting Windows ufficiale
+            cmdline = subprocess.list2cmdline(cmd_list)
             return subprocess.run(cmdline, capture_output=True, text=True, shell=True)
         raise
 
@@ -243,29 +588,211 @@ def exiftool_version(exiftool: str) -> Optional[str]:
     return None
 
 
+def ensure_pickeddate_config(base: Path) -> Optional[str]:
+    """Genera (se serve) una config exiftool con un tag composito 'PickedDate'
+    che sceglie lato exiftool la prima data disponibile secondo la priorità di
+    DATE_KEYS. Il JSON di risposta contiene così un solo campo invece di 13."""
+    desire = "\n".join(f"                {i} => '{k}'," for i, k in enumerate(DATE_KEYS))
+    content = (
+        "# Generata da organize_photos: tag composito che sceglie la prima data\n"
+        "# disponibile secondo la priorita' di DATE_KEYS (non modificare a mano).\n"
+        "%Image::ExifTool::UserDefined = (\n"
+        "    'Image::ExifTool::Composite' => {\n"
+        "        PickedDate => {\n"
+        "            Desire => {\n"
+        f"{desire}\n"
+        "            },\n"
+        "            ValueConv => 'for (@val) { return $_ if defined $_ } return undef;',\n"
+        "        },\n"
+        "    },\n"
+        ");\n"
+        "1; # end\n"
+    )
+    cfg = base / EXIFTOOL_CONFIG_FILE
+    try:
+        if not cfg.exists() or cfg.read_text(encoding="utf-8") != content:
+            cfg.write_text(content, encoding="utf-8")
+        return str(cfg)
+    except Exception:
+        return None
+
+
+def _date_tags() -> List[str]:
+    return ["PickedDate"] if EXIF_CONFIG_PATH else DATE_KEYS
+
+
+def _pick_date_from_record(obj: dict) -> Tuple[Optional[datetime], Optional[str]]:
+    """Estrae la prima data valida da un record exiftool (già normalizzata)."""
+    for sv in _to_str_values(obj.get("PickedDate")):
+        dt = parse_date_string(sv)
+        if dt:
+            return _normalize_dt(dt), "PickedDate"
+    for k in DATE_KEYS:
+        for sv in _to_str_values(obj.get(k)):
+            dt = parse_date_string(sv)
+            if dt:
+                return _normalize_dt(dt), k
+    return None, None
+
+
+# exiftool persistente (-stay_open): un solo processo per tutta la sessione
+# invece di pagare l'avvio dell'interprete Perl (~300ms) ad ogni batch.
+
+class ExifToolDaemon:
+    """Processo exiftool a lunga vita pilotato via '-stay_open True -@ -'.
+
+    Ogni chiamata scrive un blocco di argomenti (uno per riga) su stdin seguito
+    da '-execute<N>' e legge stdout fino al sentinel '{ready<N>}'. Il numero
+    progressivo evita di confondere le risposte di chiamate successive."""
+
+    def __init__(self, exiftool: str):
+        self.exiftool = exiftool
+        self._proc: Optional[subprocess.Popen] = None
+        self._seq = 0
+        self._lock = threading.Lock()  # il demone può essere usato da più thread
+
+    def start(self):
+        cmd = [self.exiftool]
+        if EXIF_CONFIG_PATH:
+            cmd.extend(["-config", EXIF_CONFIG_PATH])  # -config deve precedere tutto
+        cmd.extend(["-stay_open", "True", "-@", "-"])
+        # Argomenti invarianti una volta sola all'avvio (-common_args) invece
+        # di rispedirli su stdin ad ogni blocco. Fotografati qui: il demone
+        # parte lazy, dopo che main() ha già applicato le flag CLI.
+        cmd.extend(["-common_args", "-q", "-q", "-charset", "filename=utf8",
+                    "-d", "%Y:%m:%d %H:%M:%S%z"])
+        if QUICKTIME_UTC:
+            cmd.extend(["-api", "QuickTimeUTC"])
+        self._proc = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            text=True, encoding="utf-8", errors="replace")
+
+    def execute(self, args: List[str]) -> str:
+        """Esegue un blocco di argomenti e ritorna lo stdout fino al sentinel."""
+        with self._lock:
+            if self._proc is None or self._proc.poll() is not None:
+                self.start()
+            self._seq += 1
+            token = self._seq
+            self._proc.stdin.write("\n".join(args) + f"\n-execute{token}\n")
+            self._proc.stdin.flush()
+            sentinel = f"{{ready{token}}}"
+            out_lines = []
+            while True:
+                line = self._proc.stdout.readline()
+                if not line:
+                    raise RuntimeError("exiftool stay_open terminato inaspettatamente")
+                if line.strip() == sentinel:
+                    break
+                out_lines.append(line)
+            return "".join(out_lines)
+
+    def close(self):
+        if self._proc is None:
+            return
+        try:
+            self._proc.stdin.write("-stay_open\nFalse\n")
+            self._proc.stdin.flush()
+            self._proc.wait(timeout=5)
+        except Exception:
+            try:
+                self._proc.kill()
+            except Exception:
+                pass
+        self._proc = None
+
+
+# Più demoni in parallelo (shard): su foto con metadati densi (RAW Nikon e
+# Canon) il singolo exiftool satura un core, con N demoni i batch scalano.
+_EXIF_DAEMONS: Dict[int, ExifToolDaemon] = {}
+# I thread del pool chiamano _get_exiftool_daemon in parallelo: senza lock due
+# chunk sullo stesso shard possono creare due demoni (uno resta orfano senza
+# close) o chiudere un demone mentre l'altro thread ci sta scrivendo.
+_EXIF_DAEMONS_LOCK = threading.Lock()
+_EXIF_DAEMON_BROKEN = False
+
+
+def _get_exiftool_daemon(exiftool: str, shard: int = 0) -> Optional[ExifToolDaemon]:
+    global _EXIF_DAEMON_BROKEN
+    if _EXIF_DAEMON_BROKEN:
+        return None
+    with _EXIF_DAEMONS_LOCK:
+        d = _EXIF_DAEMONS.get(shard)
+        if d is None or d.exiftool != exiftool:
+            if d is not None:
+                d.close()
+            d = ExifToolDaemon(exiftool)
+            _EXIF_DAEMONS[shard] = d
+        return d
+
+
+def _close_exiftool_daemon():
+    with _EXIF_DAEMONS_LOCK:
+        for d in _EXIF_DAEMONS.values():
+            d.close()
+        _EXIF_DAEMONS.clear()
+
+
+def _exif_daemon_workers() -> int:
+    if EXIF_WORKERS > 0:
+        return EXIF_WORKERS
+    return min(4, os.cpu_count() or 1)
+
+
 # (7) Exiftool wrapper con file argomenti e retry
 
+def _abs_path_str(p: Union[str, Path]) -> str:
+    """Percorso assoluto per exiftool senza toccare il filesystem: a
+    differenza di Path.resolve() (che risolve i symlink con syscall per
+    ogni componente), os.path.abspath è puro lavoro su stringhe."""
+    return os.path.abspath(os.fspath(p))
+
+
 def run_exiftool_json(exiftool: str, tags: List[str], files: List[Path], fast: bool = True) -> Optional[List[dict]]:
+    global _EXIF_DAEMON_BROKEN
     if not files:
         return []
     fmt = ["-d", "%Y:%m:%d %H:%M:%S%z"]
-    base_cmd = [exiftool, "-q", "-q", "-j", "-charset", "filename=utf8", *fmt]
+    common = ["-q", "-q", "-j", "-charset", "filename=utf8", *fmt]
     if QUICKTIME_UTC:
-        base_cmd.extend(["-api", "QuickTimeUTC"])
+        common.extend(["-api", "QuickTimeUTC"])
     if fast:
-        base_cmd.insert(2, "-fast")  # dopo -q -q
+        common.insert(2, "-fast")  # dopo -q -q
 
     tag_args = [f"-{k}" for k in tags]
 
+    # Percorso caldo: demone -stay_open (niente spawn per batch; -config con
+    # PickedDate e gli argomenti invarianti via -common_args sono già caricati
+    # all'avvio del demone, qui viaggiano solo i parametri per-chiamata)
+    daemon = _get_exiftool_daemon(exiftool)
+    if daemon is not None:
+        daemon_args = ["-j"]
+        if fast:
+            daemon_args.append("-fast")
+        try:
+            out = daemon.execute(daemon_args + tag_args + [_abs_path_str(p) for p in files])
+            if out.strip():
+                return json.loads(out)
+            return None
+        except Exception as e:
+            print(f"[WARN] exiftool stay_open non utilizzabile ({e}): passo alle invocazioni singole.")
+            _EXIF_DAEMON_BROKEN = True
+            _close_exiftool_daemon()
+
+    # -config deve essere il primo argomento della riga di comando
+    cfg_args = ["-config", EXIF_CONFIG_PATH] if EXIF_CONFIG_PATH else []
+    base_cmd = [exiftool, *cfg_args, *common]
+
     # Scrivi lista file in file temporaneo per -@
     with tempfile.NamedTemporaryFile("w", delete=False, encoding="utf-8", newline="\n") as tf:
         argfile = tf.name
         for p in files:
-            tf.write(str(p.resolve()) + "\n")
+            tf.write(_abs_path_str(p) + "\n")
 
     try:
         attempts = [base_cmd + tag_args + ["-@", argfile],
-                    [exiftool, "-q", "-q", "-j", "-charset", "filename=utf8", *fmt, *tag_args, "-@", argfile]]
+                    [exiftool, *cfg_args, "-q", "-q", "-j", "-charset", "filename=utf8", *fmt, *tag_args, "-@", argfile]]
         for i, cmd in enumerate(attempts, start=1):
             r = _run_cmd_robust(cmd)
             if r.returncode == 0 and r.stdout.strip():
@@ -284,42 +811,183 @@ def run_exiftool_json(exiftool: str, tags: List[str], files: List[Path], fast: b
     return None
 
 
+def run_exiftool_dates_tsv(exiftool: str, tags: List[str], files: List[Path],
+                           shard: int = 0) -> Optional[List[dict]]:
+    """Lettura date in formato tabellare (-T): ogni riga si spezza con un
+    semplice split('\\t') senza passare dal parser JSON. Ritorna record nello
+    stesso formato di run_exiftool_json ('-' = tag assente, omesso)."""
+    if not files:
+        return []
+    # -q/-charset/-d/QuickTimeUTC arrivano dai -common_args del demone
+    args = ["-T", "-fast", "-SourceFile"]
+    args.extend(f"-{k}" for k in tags)
+    daemon = _get_exiftool_daemon(exiftool, shard)
+    if daemon is None:
+        return None
+    try:
+        out = daemon.execute(args + [_abs_path_str(p) for p in files])
+    except Exception:
+        return None
+    records = []
+    for line in out.splitlines():
+        fields = line.split("\t")
+        if len(fields) != len(tags) + 1:
+            continue
+        obj = {"SourceFile": fields[0]}
+        for k, v in zip(tags, fields[1:]):
+            if v and v != "-":
+                obj[k] = v
+        records.append(obj)
+    return records
+
+
+# Cache date metadata per (path assoluto, size, mtime_ns): condivisa fra
+# batch, keeper e letture singole, così ogni file viene interrogato una sola
+# volta per sessione. Persistita su disco: i re-run saltano i file invariati
+# senza nemmeno passare da exiftool. Valore: (datetime, tag) oppure None se
+# exiftool non ha trovato una data parsabile (anche questo vale la pena
+# ricordarlo, per non ritentare).
+
+_EXIF_DATE_CACHE: Dict[Tuple[str, int, int], Optional[Tuple[datetime, str]]] = {}
+_EXIF_DATE_CACHE_DIRTY = False
+
+
+def _exif_cache_key(p: Union[str, Path]) -> Optional[Tuple[str, int, int]]:
+    try:
+        sp = _abs_path_str(p)
+        st = os.stat(sp)
+        return (sp, st.st_size, st.st_mtime_ns)
+    except OSError:
+        return None
+
+
+def _exif_cache_store(key: Tuple[str, int, int], value: Optional[Tuple[datetime, str]]):
+    global _EXIF_DATE_CACHE_DIRTY
+    _EXIF_DATE_CACHE[key] = value
+    _EXIF_DATE_CACHE_DIRTY = True
+
+
+def load_exif_date_cache(base: Path):
+    f = base / EXIF_DATE_CACHE_FILE
+    if not f.exists():
+        return
+    try:
+        data = json.loads(f.read_text(encoding="utf-8"))
+        for sp, entry in data.items():
+            size, mtime_ns, iso, tag = entry
+            value = (datetime.fromisoformat(iso), tag) if iso else None
+            _EXIF_DATE_CACHE[(sp, int(size), int(mtime_ns))] = value
+    except Exception:
+        pass
+
+
+def save_exif_date_cache(base: Path):
+    global _EXIF_DATE_CACHE_DIRTY
+    if not _EXIF_DATE_CACHE_DIRTY:
+        return
+    try:
+        data = {sp: [size, mtime_ns,
+                     value[0].isoformat() if value else None,
+                     value[1] if value else None]
+                for (sp, size, mtime_ns), value in _EXIF_DATE_CACHE.items()}
+        (base / EXIF_DATE_CACHE_FILE).write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        _EXIF_DATE_CACHE_DIRTY = False
+    except Exception:
+        pass
+
+
+def _get_exif_date_cached(p: Path, exiftool: str) -> Tuple[Optional[datetime], Optional[str]]:
+    """Lettura singola con cache: exiftool viene interpellato solo al primo
+    accesso per (path, size, mtime_ns)."""
+    key = _exif_cache_key(p)
+    if key is not None and key in _EXIF_DATE_CACHE:
+        hit = _EXIF_DATE_CACHE[key]
+        return hit if hit else (None, None)
+    dt: Optional[datetime] = None
+    tag: Optional[str] = None
+    try:
+        arr = run_exiftool_json(exiftool, _date_tags(), [p], fast=True)
+        if arr and isinstance(arr, list):
+            dt, tag = _pick_date_from_record(arr[0])
+    except Exception:
+        dt, tag = None, None
+    if key is not None:
+        _exif_cache_store(key, (dt, tag) if dt else None)
+    return dt, tag
+
+
 def exif_dates_batch(exiftool: str, files: List[Path], batch_size: int) -> Dict[Path, datetime]:
     result: Dict[Path, datetime] = {}
     if not files or not exiftool:
         return result
-    for i in range(0, len(files), batch_size):
-        chunk = files[i:i + batch_size]
-        arr = run_exiftool_json(exiftool, DATE_KEYS, chunk, fast=True)
+
+    # Prima la cache: i file invariati da un run precedente (o già visti in
+    # questa sessione) non toccano exiftool.
+    misses: List[Path] = []
+    for p in files:
+        key = _exif_cache_key(p)
+        hit = _EXIF_DATE_CACHE.get(key) if key is not None else None
+        if key is not None and key in _EXIF_DATE_CACHE:
+            if hit:
+                result[p] = hit[0]
+            elif WARN_ON_MTIME:
+                log_line(f"[WARN] Nessuna data metadata parsabile (batch) per: {p.name}. Userò mtime al bisogno.", per_file=True)
+        else:
+            misses.append(p)
+
+    # Auto-tune verso l'alto: il costo fisso per chiamata (protocollo del
+    # demone, o peggio uno spawn nel fallback) si ammortizza su blocchi
+    # grandi, quindi su liste lunghe non ha senso restare a batch piccoli.
+    effective_batch = max(batch_size, min(500, len(misses) // max(1, os.cpu_count() or 1)))
+
+    # Alias locali per il loop per-record: il lookup di variabile locale
+    # costa meno di quello di modulo su decine di migliaia di iterazioni.
+    pick_date = _pick_date_from_record
+    cache_key = _exif_cache_key
+    cache_store = _exif_cache_store
+    log = log_line
+
+    chunks = [misses[i:i + effective_batch] for i in range(0, len(misses), effective_batch)]
+    n_shards = min(_exif_daemon_workers(), len(chunks))
+
+    def _fetch(shard_chunk: Tuple[int, List[Path]]):
+        shard, chunk = shard_chunk
+        # Preferisci l'output tabellare (parse più economico del JSON)
+        arr = run_exiftool_dates_tsv(exiftool, _date_tags(), chunk, shard=shard)
+        if arr is None:
+            arr = run_exiftool_json(exiftool, _date_tags(), chunk, fast=True)
+        return chunk, arr
+
+    if n_shards > 1:
+        # Un demone exiftool per shard: i batch girano davvero in parallelo
+        # (il lavoro è nei processi esterni, i thread servono solo da pompa).
+        with ThreadPoolExecutor(max_workers=n_shards) as ex:
+            fetched = list(ex.map(_fetch, ((i % n_shards, c) for i, c in enumerate(chunks))))
+    else:
+        fetched = [_fetch((0, c)) for c in chunks]
+
+    for chunk, arr in fetched:
         if not arr:
             for p in chunk:
                 if WARN_ON_MTIME:
-                    print(f"[WARN] Nessuna data metadata parsabile (batch) per: {p.name}. Userò mtime al bisogno.")
+                    log(f"[WARN] Nessuna data metadata parsabile (batch) per: {p.name}. Userò mtime al bisogno.", per_file=True)
             continue
         for obj in arr:
             src = obj.get("SourceFile")
             if not src:
                 continue
             path = Path(src)
-            chosen = None
-            chosen_key = None
-            for k in DATE_KEYS:
-                vals = _to_str_values(obj.get(k))
-                for sv in vals:
-                    dt = parse_date_string(sv)
-                    if dt:
-                        chosen = _normalize_dt(dt)
-                        chosen_key = k
-                        break
-                if chosen:
-                    break
+            chosen, chosen_key = pick_date(obj)
+            key = cache_key(path)
+            if key is not None:
+                cache_store(key, (chosen, chosen_key) if chosen else None)
             if chosen:
                 result[path] = chosen
                 if LOG_PICKED_DATE:
-                    print(f"[DATE] {path.name}: {chosen.isoformat()} (tag={chosen_key})")
+                    log(f"[DATE] {path.name}: {chosen.isoformat()} (tag={chosen_key})", per_file=True)
             else:
                 if WARN_ON_MTIME:
-                    print(f"[WARN] Nessuna data metadata parsabile (batch) per: {path.name}. Userò mtime al bisogno.")
+                    log(f"[WARN] Nessuna data metadata parsabile (batch) per: {path.name}. Userò mtime al bisogno.", per_file=True)
     return result
 
 
@@ -327,41 +995,60 @@ def get_taken_datetime(p: Path, exiftool: Optional[str], premap: Optional[Dict[P
     if premap and p in premap:
         return premap[p]
     if exiftool:
-        arr = run_exiftool_json(exiftool, DATE_KEYS, [p], fast=True)
-        if arr and isinstance(arr, list) and arr:
-            obj = arr[0]
-            for k in DATE_KEYS:
-                vals = _to_str_values(obj.get(k))
-                for sv in vals:
-                    dt = parse_date_string(sv)
-                    if dt:
-                        dt = _normalize_dt(dt)
-                        if LOG_PICKED_DATE:
-                            print(f"[DATE] {p.name}: {dt.isoformat()} (tag={k})")
-                        return dt
-            if WARN_ON_MTIME:
-                print(f"[WARN] Nessuna data metadata parsabile per: {p.name}. Uso mtime.")
-        else:
-            if WARN_ON_MTIME:
-                print(f"[WARN] exiftool non ha restituito dati per {p.name}. Uso mtime.")
+        dt, k = _get_exif_date_cached(p, exiftool)
+        if dt:
+            if LOG_PICKED_DATE:
+                log_line(f"[DATE] {p.name}: {dt.isoformat()} (tag={k})", per_file=True)
+            return dt
+        if WARN_ON_MTIME:
+            log_line(f"[WARN] Nessuna data metadata parsabile per: {p.name}. Uso mtime.", per_file=True)
     return datetime.fromtimestamp(p.stat().st_mtime)
 
 # ----------------------------
 # Duplicati e organizzazione
 # ----------------------------
 
+# Cache dei listing directory per sidecars_for: una scandir per cartella al
+# posto di uno stat per estensione sidecar ripetuto per ogni file della
+# stessa dir. move_path e le delete dei duplicati invalidano le voci toccate.
+_DIR_NAMES_CACHE: Dict[str, frozenset] = {}
+_DIR_NAMES_MAX = 4096
+
+
+def _dir_names(parent: str) -> frozenset:
+    names = _DIR_NAMES_CACHE.get(parent)
+    if names is None:
+        try:
+            with os.scandir(parent) as it:
+                names = frozenset(e.name for e in it)
+        except OSError:
+            names = frozenset()
+        if len(_DIR_NAMES_CACHE) >= _DIR_NAMES_MAX:
+            _DIR_NAMES_CACHE.clear()
+        _DIR_NAMES_CACHE[parent] = names
+    return names
+
+
+def _dir_names_invalidate(parent: str):
+    _DIR_NAMES_CACHE.pop(parent, None)
+
+
 def sidecars_for(p: Path) -> Iterable[Path]:
     """(4) Cerca sidecar accanto al file, e in sub-secondo step anche nella base del job.
     Qui implementiamo la ricerca accanto al file (src.parent)."""
     stem = p.with_suffix("").name
     parent = p.parent
+    names = _dir_names(str(parent))
     for ext in SIDECAR_EXT:
-        cand = parent / f"{stem}{ext}"
-        try:
-            if cand.is_file():
-                yield cand
-        except Exception:
-            continue
+        cand = f"{stem}{ext}"
+        if cand in names:
+            yield parent / cand
+        else:
+            # il vecchio probe is_file era case-insensitive su Windows/mac:
+            # copri almeno la variante tutta maiuscola (es. .AAE di iOS)
+            alt = f"{stem}{ext.upper()}"
+            if alt in names:
+                yield parent / alt
 
 
 def ensure_dir(p: Path, dry_run: bool):
@@ -369,6 +1056,98 @@ def ensure_dir(p: Path, dry_run: bool):
         p.mkdir(parents=True, exist_ok=True)
 
 
+def _copy_via_kernel(src_s: str, dst_s: str) -> bool:
+    """Copia cross-volume con os.copy_file_range (Linux >= 4.5): i byte non
+    passano mai da buffer userspace e su btrfs/XFS diventa un reflink.
+    Ritorna False se non supportato o fallita: il chiamante ripiega su
+    shutil.move. In caso di errore a metà la destinazione parziale viene
+    rimossa, la sorgente resta intatta."""
+    if not hasattr(os, "copy_file_range"):
+        return False
+    try:
+        with open(src_s, "rb") as fsrc, open(dst_s, "wb") as fdst:
+            remaining = os.fstat(fsrc.fileno()).st_size
+            while remaining > 0:
+                n = os.copy_file_range(fsrc.fileno(), fdst.fileno(), min(remaining, 1 << 30))
+                if n == 0:
+                    break
+                remaining -= n
+            if remaining > 0:
+                raise OSError("copy_file_range incompleta")
+        shutil.copystat(src_s, dst_s)
+        os.unlink(src_s)
+        return True
+    except OSError:
+        try:
+            os.unlink(dst_s)
+        except OSError:
+            pass
+        return False
+
+
+def move_path(src: Union[str, Path], dst: Union[str, Path]):
+    """Sposta un file. Se sorgente e destinazione stanno sullo stesso volume
+    (il caso normale: YYYY/MM e quarantena vivono sotto base) basta un rename
+    atomico in un syscall; shutil.move resta per il caso cross-volume."""
+    src_s, dst_s = os.fspath(src), os.fspath(dst)
+    # entrambe le directory cambiano contenuto: via dalla cache dei listing
+    _dir_names_invalidate(os.path.dirname(src_s) or ".")
+    _dir_names_invalidate(os.path.dirname(dst_s) or ".")
+    try:
+        # prova diretta: niente stat preventivi, il kernel risponde EXDEV
+        # da solo se i volumi sono diversi
+        os.replace(src_s, dst_s)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        if not _copy_via_kernel(src_s, dst_s):
+            shutil.move(src_s, dst_s)
+
+
+def process_sidecars(src: Path, dest_dir: Path) -> int:
+    """Sposta i sidecar di src in dest_dir. Partiziona prima di agire:
+    assente a destinazione → move diretto; dimensione diversa → conflitto
+    senza hash; dimensione uguale → confronto hash (in parallelo).
+    Ritorna il numero di conflitti."""
+    conflicts = 0
+    to_move: List[Tuple[Path, Path]] = []
+    to_hash: List[Tuple[Path, Path]] = []
+    for sc_src in sidecars_for(src):
+        sc_dest = dest_dir / sc_src.name
+        try:
+            dst_size = sc_dest.stat().st_size
+        except OSError:
+            to_move.append((sc_src, sc_dest))
+            continue
+        try:
+            src_size = sc_src.stat().st_size
+        except OSError:
+            continue  # sparito nel frattempo: niente da fare
+        if src_size != dst_size:
+            log_line(f"         (sidecar) CONFLITTO {sc_src.name} già presente ma diverso. Non sposto.")
+            conflicts += 1
+        else:
+            to_hash.append((sc_src, sc_dest))
+    for sc_src, sc_dest in to_hash:
+        try:
+            ha, hb = _pair_hash(file_fingerprint_cached, sc_src, sc_dest)
+            if ha == hb:
+                log_line(f"         (sidecar) {sc_src.name} già presente (identico). Salto.", per_file=True)
+            else:
+                log_line(f"         (sidecar) CONFLITTO {sc_src.name} già presente ma diverso. Non sposto.")
+                conflicts += 1
+        except Exception:
+            conflicts += 1
+    # move solo a decisioni prese: error reporting coerente
+    for sc_src, sc_dest in to_move:
+        try:
+            move_path(sc_src, sc_dest)
+            log_line(f"         (sidecar) spostato {sc_src.name}", per_file=True)
+        except Exception as e:
+            log_line(f"         (sidecar) ERRORE spostando {sc_src.name}: {e}")
+    return conflicts
+
+
 def append_report_line(base: Path, src: Path, dst: Path, dry_run: bool):
     line = f"DUPLICATO: '{src.name}' uguale a '{dst.name}' in {dst.parent}\n"
     if not dry_run:
@@ -384,6 +1163,50 @@ def append_jsonl(path: Path, obj: dict):
         pass
 
 
+class JsonlWriter:
+    """Scrittura JSONL con handle pre-aperto: un open per report invece di
+    uno per riga (append_jsonl apre/chiude ad ogni record, che su migliaia
+    di azioni pesa, specie su Windows). Di default flush per record: per i
+    log di azioni distruttive (quarantena/delete) non si può perdere la
+    coda se il processo muore. I report puramente informativi possono
+    passare flush_every più alto per raggruppare i flush.
+    Gli errori di IO vengono inghiottiti, come in append_jsonl."""
+
+    def __init__(self, path: Path, flush_every: int = 1):
+        self.path = path
+        self._f = None
+        self._pending = 0
+        self._flush_every = max(1, flush_every)
+
+    def __enter__(self):
+        try:
+            self._f = self.path.open("a", encoding="utf-8")
+        except Exception:
+            self._f = None
+        return self
+
+    def write(self, obj: dict):
+        if self._f is None:
+            return
+        try:
+            self._f.write(json.dumps(obj, ensure_ascii=False) + "\n")
+            self._pending += 1
+            if self._pending >= self._flush_every:
+                self._f.flush()
+                self._pending = 0
+        except Exception:
+            pass
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if self._f is not None:
+                self._f.close()
+        except Exception:
+            pass
+        self._f = None
+        return False
+
+
 def human_size(n: int) -> str:
     units = ["B", "KB", "MB", "GB", "TB"]
     i = 0
@@ -394,16 +1217,26 @@ def human_size(n: int) -> str:
     return f"{f:.2f} {units[i]}"
 
 
-def walk_files(base: Path, recursive: bool) -> Iterable[Path]:
+def walk_files(base: Path, recursive: bool) -> Iterable[Tuple[str, int, float]]:
+    """Enumera (percorso, dimensione, mtime) dei file candidati.
+
+    Stringhe + stat già in cache nel DirEntry: si evitano un secondo syscall
+    stat per file e l'allocazione di un Path per ogni voce (i Path si creano
+    a valle solo per i file che servono davvero, es. i duplicati). Il mtime
+    viene esposto qui perché lo stat è comunque già in mano: così i
+    consumatori (es. scelta del keeper) non devono rifarlo più avanti."""
     if not recursive:
         with os.scandir(base) as it:
             for e in it:
-                if e.is_file(follow_symlinks=False):
-                    _, ext = os.path.splitext(e.name)
-                    if ext.lower() in ALL_EXT:
-                        yield Path(base / e.name)
+                try:
+                    # prima il test (economico) sull'estensione, poi is_file
+                    if _ext_lower(e.name) in ALL_EXT and e.is_file(follow_symlinks=False):
+                        st = e.stat(follow_symlinks=False)
+                        yield e.path, st.st_size, st.st_mtime
+                except Exception:
+                    continue
     else:
-        stack = [base]
+        stack = [str(base)]
         while stack:
             d = stack.pop()
             try:
@@ -411,98 +1244,234 @@ def walk_files(base: Path, recursive: bool) -> Iterable[Path]:
                     for e in it:
                         try:
                             if e.is_dir(follow_symlinks=False):
-                                stack.append(Path(e.path))
-                            elif e.is_file(follow_symlinks=False):
-                                _, ext = os.path.splitext(e.name)
-                                if ext.lower() in ALL_EXT:
-                                    yield Path(e.path)
+                                stack.append(e.path)
+                            elif _ext_lower(e.name) in ALL_EXT and e.is_file(follow_symlinks=False):
+                                st = e.stat(follow_symlinks=False)
+                                yield e.path, st.st_size, st.st_mtime
                         except Exception:
                             continue
             except Exception:
                 continue
 
 
-def find_duplicate_groups(base: Path, recursive: bool, prehash_bytes: int):
-    size_map: Dict[int, List[Path]] = defaultdict(list)
-    total_files = 0
+def _hash_workers() -> int:
+    """Parallelismo per l'hashing: il pool stesso fa da tetto agli open/read
+    concorrenti (niente semaforo separato), quindi il valore limita anche le
+    I/O storm su dischi lenti."""
+    return max(4, min(16, (os.cpu_count() or 1) * 2))
+
+
+def _bucket_by_size(base: Path, recursive: bool):
+    """Fase 1 (seriale): indicizzazione + bucket per dimensione.
+
+    Indice in layout SoA: tre colonne parallele (path, size, mtime) invece
+    di un dict di liste. Le colonne numeriche stanno in array compatti
+    (8 byte/voce contro ~28 di un int boxed) e nessun Path viene allocato
+    in questa fase: su librerie da centinaia di migliaia di file contano
+    sia la memoria sia la località in cache durante il raggruppamento.
+
+    Ritorna (paths, sizes, multi_size, total_bytes, mtimes, videos) dove
+    multi_size è la lista dei gruppi di indici con almeno 2 file della
+    stessa size e videos sono i soli file video (servono a valle per i
+    near-duplicates: raccoglierli qui evita una seconda traversata)."""
+    paths: List[str] = []
+    sizes = array("q")
+    file_mtimes = array("d")
+    videos: List[str] = []
     total_bytes = 0
-    start_ts = datetime.now()
 
-    for p in walk_files(base, recursive):
-        try:
-            st = p.stat()
-        except Exception:
-            continue
-        size_map[st.st_size].append(p)
-        total_files += 1
-        total_bytes += st.st_size
-        if total_files % 1000 == 0:
-            elapsed = (datetime.now() - start_ts).total_seconds() or 1
-            rate = total_files / elapsed
-            print(f"  … indicizzati {total_files} file (≈{rate:.1f} file/s)")
-
-    partial_groups: Dict[Tuple[int, str], List[Path]] = defaultdict(list)
-    for size, group in size_map.items():
-        if len(group) < 2:
-            continue
-        for p in group:
+    # Progresso da un thread campionatore: niente datetime.now()/print (con
+    # flush stdio) dentro il loop caldo, una riga al secondo finché dura
+    # l'indicizzazione. len(paths) è letto senza lock: è solo informativo.
+    done = threading.Event()
+
+    def _reporter():
+        t0 = time.monotonic()
+        while not done.wait(1.0):
+            n = len(paths)
+            elapsed = time.monotonic() - t0
+            if n and elapsed > 0:
+                print(f"  … indicizzati {n} file (≈{n / elapsed:.1f} file/s)")
+
+    reporter = threading.Thread(target=_reporter, daemon=True)
+    reporter.start()
+    try:
+        for sp, size, mtime in walk_files(base, recursive):
+            paths.append(sp)
+            sizes.append(size)
+            file_mtimes.append(mtime)
+            if _ext_lower(sp) in VIDEO_EXT:
+                videos.append(sp)
+            total_bytes += size
+    finally:
+        done.set()
+        reporter.join()
+
+    # Raggruppamento per size su indici: con NumPy argsort + segmentazione
+    # run-length sulla colonna (vettoriale, zero-copy via frombuffer);
+    # altrimenti dict di indici interi (comunque niente liste di Path).
+    # I gruppi con un solo file non possono contenere duplicati.
+    multi_size: List[List[int]] = []
+    if np is not None and paths:
+        arr = np.frombuffer(sizes, dtype=np.int64)
+        order = np.argsort(arr, kind="stable")
+        boundaries = np.nonzero(np.diff(arr[order]))[0] + 1
+        for seg in np.split(order, boundaries):
+            if len(seg) >= 2:
+                multi_size.append(seg.tolist())
+    else:
+        by_size: Dict[int, List[int]] = defaultdict(list)
+        for i, size in enumerate(sizes):
+            by_size[size].append(i)
+        multi_size = [g for g in by_size.values() if len(g) >= 2]
+
+    # mtime solo per i candidati: il keeper li consulta solo sui duplicati,
+    # che sono per forza un sottoinsieme dei bucket multi-file.
+    mtimes: Dict[str, float] = {}
+    for group_idx in multi_size:
+        for i in group_idx:
+            mtimes[paths[i]] = file_mtimes[i]
+
+    return paths, sizes, multi_size, total_bytes, mtimes, videos
+
+
+def _inode_key(p: str) -> Tuple[int, int]:
+    """Chiave (device, inode) per ordinare le letture in ordine fisico
+    approssimato su disco: su HDD (e SSD frammentati) hashare in ordine di
+    inode riduce drasticamente i seek rispetto all'ordine di directory.
+    Lo stat è caldo in cache dopo la traversata, costa poco."""
+    try:
+        st = os.stat(p)
+        return (st.st_dev, st.st_ino)
+    except OSError:
+        return (1 << 62, 0)
+
+
+def _tiny_stage(paths: List[str], sizes, multi_size: List[List[int]]) -> Dict[Tuple[int, bytes], List[str]]:
+    """Fase 2 (parallela): fingerprint dei primi 4 KB per i bucket multi-file.
+    Scarta la maggior parte dei gruppi con una sola lettura di settore."""
+    tiny_groups: Dict[Tuple[int, bytes], List[str]] = defaultdict(list)
+    pending = [(paths[i], sizes[i]) for group_idx in multi_size for i in group_idx]
+    pending.sort(key=lambda t: _inode_key(t[0]))
+    with ThreadPoolExecutor(max_workers=_hash_workers()) as ex:
+        futs = {}
+        for p, size in pending:
+            futs[ex.submit(file_fingerprint_tiny, p)] = (size, p)
+        for fut in as_completed(futs):
+            size, p = futs[fut]
             try:
-                ph = file_sha1_head(p, prehash_bytes)
+                th = fut.result()
             except Exception:
                 continue
-            partial_groups[(size, ph)].append(p)
-
-    full_groups: Dict[str, List[Path]] = defaultdict(list)
-    for (size, ph), group in partial_groups.items():
+            tiny_groups[(size, th)].append(p)
+    return tiny_groups
+
+
+def _prehash_stage(tiny_groups: Dict[Tuple[int, bytes], List[str]], prehash_bytes: int):
+    """Fase 3 (parallela): pre-hash dei primi prehash_bytes per i gruppi
+    sopravvissuti. Per i file <= prehash_bytes il pre-hash leggerebbe
+    l'intero file: inutile farlo due volte, si calcola subito il
+    fingerprint completo (una lettura)."""
+    partial_groups: Dict[Tuple[int, bytes], List[str]] = defaultdict(list)
+    full_groups: Dict[bytes, List[str]] = defaultdict(list)
+    pending: List[Tuple[str, Optional[int]]] = []
+    for (size, th), group in tiny_groups.items():
         if len(group) < 2:
             continue
+        if size <= TINY_HASH_BYTES:
+            # Il fingerprint da 4 KB ha già coperto l'intero file: è il
+            # digest completo, promuovilo senza rileggere nulla.
+            full_groups[th].extend(group)
+            continue
+        small = size <= prehash_bytes
         for p in group:
+            pending.append((p, None if small else size))
+    pending.sort(key=lambda t: _inode_key(t[0]))
+    with ThreadPoolExecutor(max_workers=_hash_workers()) as ex:
+        futs = {}
+        for p, size in pending:
+            if size is None:
+                futs[ex.submit(file_fingerprint, p)] = (None, p)
+            else:
+                futs[ex.submit(file_fingerprint_head, p, prehash_bytes)] = (size, p)
+        for fut in as_completed(futs):
+            size, p = futs[fut]
+            try:
+                h = fut.result()
+            except Exception:
+                continue
+            if size is None:
+                full_groups[h].append(p)
+            else:
+                partial_groups[(size, h)].append(p)
+    return partial_groups, full_groups
+
+
+def _fullhash_stage(partial_groups: Dict[Tuple[int, bytes], List[str]],
+                    full_groups: Dict[bytes, List[str]]):
+    """Fase 4 (parallela): full hash solo per i file grandi che collidono
+    anche sul pre-hash. Accumula dentro full_groups."""
+    pending = [p for group in partial_groups.values() if len(group) >= 2 for p in group]
+    pending.sort(key=_inode_key)
+    with ThreadPoolExecutor(max_workers=_hash_workers()) as ex:
+        futs = {}
+        for p in pending:
+            futs[ex.submit(file_fingerprint, p)] = p
+        for fut in as_completed(futs):
+            p = futs[fut]
             try:
-                h = file_sha1(p)
+                h = fut.result()
             except Exception:
                 continue
             full_groups[h].append(p)
 
-    dup_groups = {h: lst for h, lst in full_groups.items() if len(lst) > 1}
-    return dup_groups, total_files, total_bytes
+
+def find_duplicate_groups(base: Path, recursive: bool, prehash_bytes: int):
+    """Cascata dal più economico al più costoso: size → 4KB → 4MB → file
+    intero. L'hashing gira in thread (hashlib/blake3 rilasciano il GIL,
+    quindi i thread scalano e le letture concorrenti saturano gli SSD)."""
+    paths, sizes, multi_size, total_bytes, mtimes, videos = _bucket_by_size(base, recursive)
+    total_files = len(paths)
+
+    tiny_groups = _tiny_stage(paths, sizes, multi_size)
+    partial_groups, full_groups = _prehash_stage(tiny_groups, prehash_bytes)
+    _fullhash_stage(partial_groups, full_groups)
+
+    # Path solo per i veri duplicati (il resto della pipeline lavora su Path)
+    dup_groups = {h: [Path(s) for s in lst] for h, lst in full_groups.items() if len(lst) > 1}
+
+    # Mappa inversa path→hash: i full hash già calcolati si riusano a valle
+    # (near-duplicates) senza rileggere i file da disco.
+    path_to_hash = {s: h for h, lst in full_groups.items() for s in lst}
+    return dup_groups, total_files, total_bytes, mtimes, videos, path_to_hash
 
 
 # (2) Keeper: preferisci data EXIF/metadata
 
-def keeper_key(p: Path, exiftool: Optional[str]) -> Tuple[int, float, str]:
+def keeper_key(p: Path, dt: Optional[datetime], mtimes: Optional[Dict[str, float]] = None) -> Tuple[int, float, str]:
     """Ordina per (has_meta, timestamp, path) dove has_meta=0 se ha data dai metadati (più desiderabile), 1 altrimenti.
-    timestamp: epoch; più piccolo = più vecchio = preferito."""
-    dt: Optional[datetime] = None
-    if exiftool:
-        try:
-            arr = run_exiftool_json(exiftool, DATE_KEYS, [p], fast=True)
-            if arr and isinstance(arr, list) and arr:
-                obj = arr[0]
-                for k in DATE_KEYS:
-                    vals = _to_str_values(obj.get(k))
-                    for sv in vals:
-                        d = parse_date_string(sv)
-                        if d:
-                            dt = _normalize_dt(d)
-                            break
-                    if dt:
-                        break
-        except Exception:
-            dt = None
+    timestamp: epoch; più piccolo = più vecchio = preferito.
+    Helper puro: la data metadata (dt) arriva pre-caricata dal chiamante,
+    mtimes sono gli mtime già raccolti durante la scansione."""
     if dt is None:
-        # fallback mtime
-        try:
-            ts = p.stat().st_mtime
-        except Exception:
-            ts = float('inf')
+        # fallback mtime (dalla cache della scansione se disponibile)
+        ts = mtimes.get(str(p)) if mtimes else None
+        if ts is None:
+            try:
+                ts = p.stat().st_mtime
+            except Exception:
+                ts = float('inf')
         return (1, ts, str(p))
     else:
         return (0, dt.timestamp(), str(p))
 
 
-def choose_keeper(paths: List[Path], exiftool: Optional[str]) -> Path:
+def choose_keeper(paths: List[Path], exiftool: Optional[str], mtimes: Optional[Dict[str, float]] = None) -> Path:
     try:
-        return min(paths, key=lambda p: keeper_key(p, exiftool))
+        # un solo round-trip exiftool per l'intero gruppo (e la cache date
+        # viene popolata di conseguenza), poi min() su tuple pure Python
+        dates = exif_dates_batch(exiftool, paths, max(1, len(paths))) if exiftool else {}
+        return min(paths, key=lambda p: keeper_key(p, dates.get(p), mtimes))
     except Exception:
         # fallback ordinamento per path
         return min(paths, key=lambda p: str(p))
@@ -522,8 +1491,13 @@ def detect_ffprobe() -> Optional[str]:
 def video_fingerprint(ffprobe: str, p: Path) -> Optional[Tuple[int, int, str, float]]:
     """Ritorna (width, height, codec, duration_rounded) per v:0. duration arrotondata a 0.5s."""
     try:
-        cmd = [ffprobe, "-v", "error", "-select_streams", "v:0",
+        # probesize/analyzeduration cappati a 1MB: per il fingerprint bastano
+        # gli header, senza lasciare a ffprobe letture multi-MB per stimare la durata
+        cmd = [ffprobe, "-v", "error",
+               "-probesize", "1000000", "-analyzeduration", "1000000",
+               "-select_streams", "v:0",
                "-show_entries", "stream=width,height,codec_name,avg_frame_rate,duration",
+               "-show_entries", "format=duration",
                "-of", "json", str(p)]
         r = subprocess.run(cmd, capture_output=True, text=True)
         if r.returncode != 0:
@@ -538,7 +1512,9 @@ def video_fingerprint(ffprobe: str, p: Path) -> Optional[Tuple[int, int, str, fl
         codec = str(s0.get("codec_name") or "?")
         dur = s0.get("duration")
         if dur is None:
-            # calcola da fps? lascio None → non comparabile
+            # fallback: durata del container (moov/mvhd per gli mp4/mov)
+            dur = (data.get("format") or {}).get("duration")
+        if dur is None:
             return None
         durf = float(dur)
         # arrotonda a 0.5s per tollerare drift
@@ -548,9 +1524,14 @@ def video_fingerprint(ffprobe: str, p: Path) -> Optional[Tuple[int, int, str, fl
         return None
 
 
-def scan_duplicates(base: Path, recursive: bool, prehash_bytes: int, enable_near_dup: bool = True):
+def scan_duplicates(base: Path, recursive: bool, prehash_bytes: int, enable_near_dup: bool = True,
+                    precomputed=None):
+    """precomputed: risultato di find_duplicate_groups già calcolato dal
+    chiamante (evita di rifare walk + hashing quando main l'ha già fatto)."""
     print(f"Inizio scansione duplicati in: {base}  (ricorsivo: {'Sì' if recursive else 'No'})")
-    dup_groups, total_files, total_bytes = find_duplicate_groups(base, recursive, prehash_bytes)
+    if precomputed is None:
+        precomputed = find_duplicate_groups(base, recursive, prehash_bytes)
+    dup_groups, total_files, total_bytes, _, videos, path_to_hash = precomputed
     groups_count = len(dup_groups)
     potential_savings = 0
 
@@ -561,7 +1542,11 @@ def scan_duplicates(base: Path, recursive: bool, prehash_bytes: int, enable_near
         except Exception:
             pass
 
-    with (base / DUP_SCAN_REPORT).open("w", encoding="utf-8") as f:
+    # report in memoria e una write_text sola alla fine: evita una chiamata
+    # encoder+write per riga nel loop dei gruppi
+    f = io.StringIO()
+    # report di sola lettura: flush raggruppato, perderne la coda non è grave
+    with JsonlWriter(base / DUP_SCAN_JSONL, flush_every=100) as jw:
         f.write(f"Report duplicati — generato: {datetime.now().isoformat()}\n")
         f.write(f"Cartella base: {base}\nRicorsivo: {'Sì' if recursive else 'No'}\n")
         f.write(f"File indicizzati: {total_files}  (totale dati: {human_size(total_bytes)})\n\n")
@@ -572,20 +1557,22 @@ def scan_duplicates(base: Path, recursive: bool, prehash_bytes: int, enable_near
                 sz = 0
             save = sz * (len(paths) - 1)
             potential_savings += save
-            f.write(f"[{i}] SHA1={h}  pezzi={len(paths)}  size={human_size(sz)}  risparmio_potenziale={human_size(save)}\n")
+            f.write(f"[{i}] {HASH_ALGO.upper()}={h.hex()}  pezzi={len(paths)}  size={human_size(sz)}  risparmio_potenziale={human_size(save)}\n")
             for p in paths:
                 f.write(f"    - {p}\n")
             f.write("\n")
             # JSONL (8)
-            append_jsonl(base / DUP_SCAN_JSONL, {
+            jw.write({
                 "group_index": i,
-                "sha1": h,
+                "hash": h.hex(),
+                "algo": HASH_ALGO,
                 "count": len(paths),
                 "size": sz,
                 "potential_saving_bytes": save,
                 "paths": [str(x) for x in paths],
             })
         f.write(f"=== RIEPILOGO ===\nGruppi duplicati: {groups_count}\nPotenziale spazio recuperabile: {human_size(potential_savings)}\n")
+    (base / DUP_SCAN_REPORT).write_text(f.getvalue(), encoding="utf-8")
 
     near_dup_summary = None
     if enable_near_dup:
@@ -593,13 +1580,17 @@ def scan_duplicates(base: Path, recursive: bool, prehash_bytes: int, enable_near
         if not ffprobe:
             print("[NEAR-DUP] ffprobe non trovato: salto la rilevazione duplicati quasi uguali.")
         else:
-            # Scansione semplice: solo video
-            video_files = [p for p in walk_files(base, recursive) if p.suffix.lower() in VIDEO_EXT]
+            # Video già raccolti durante la traversata dell'indice
+            video_files = [Path(sp) for sp in videos]
+            # ffprobe in parallelo: per i video corti domina il costo di spawn
+            # del processo, che i thread sovrappongono bene (il lavoro vero è
+            # nel processo esterno, il GIL non c'entra).
+            ff_workers = FFPROBE_WORKERS if FFPROBE_WORKERS > 0 else (os.cpu_count() or 1)
             fp_map: Dict[Tuple[int, int, str, float], List[Path]] = defaultdict(list)
-            for p in video_files:
-                fp = video_fingerprint(ffprobe, p)
-                if fp:
-                    fp_map[fp].append(p)
+            with ThreadPoolExecutor(max_workers=ff_workers) as ex:
+                for p, fp in zip(video_files, ex.map(lambda v: video_fingerprint(ffprobe, v), video_files)):
+                    if fp:
+                        fp_map[fp].append(p)
             # Report near duplicates (stesse impronte ma hash diversi)
             near_groups = []
             for fp, lst in fp_map.items():
@@ -608,24 +1599,29 @@ def scan_duplicates(base: Path, recursive: bool, prehash_bytes: int, enable_near
                 # Dividi per sha1: se più di un sha1 presente, potenziale near-dup
                 sha_map = defaultdict(list)
                 for p in lst:
-                    try:
-                        h = file_sha1(p)
-                    except Exception:
-                        continue
+                    # hash già noto dalla cascata; si ricalcola solo se il file
+                    # era unico per size (mai hashato)
+                    h = path_to_hash.get(str(p))
+                    if h is None:
+                        try:
+                            h = file_fingerprint(p)
+                        except Exception:
+                            continue
                     sha_map[h].append(p)
                 if len(sha_map) > 1:
                     near_groups.append((fp, sha_map))
             if near_groups:
                 print(f"[NEAR-DUP] Trovati {len(near_groups)} gruppi di probabili duplicati ricodificati.")
-                with (base / (DUP_SCAN_REPORT.replace('.txt', '_near.txt'))).open("w", encoding="utf-8") as nf:
-                    for idx, (fp, sha_map) in enumerate(near_groups, start=1):
-                        w, h, codec, dur = fp
-                        nf.write(f"[{idx}] {w}x{h} {codec} dur≈{dur}s\n")
-                        for hh, plist in sha_map.items():
-                            nf.write(f"  SHA1={hh} (n={len(plist)})\n")
-                            for p in plist:
-                                nf.write(f"    - {p}\n")
-                        nf.write("\n")
+                nf = io.StringIO()
+                for idx, (fp, sha_map) in enumerate(near_groups, start=1):
+                    w, h, codec, dur = fp
+                    nf.write(f"[{idx}] {w}x{h} {codec} dur≈{dur}s\n")
+                    for hh, plist in sha_map.items():
+                        nf.write(f"  {HASH_ALGO.upper()}={hh.hex()} (n={len(plist)})\n")
+                        for p in plist:
+                            nf.write(f"    - {p}\n")
+                    nf.write("\n")
+                (base / (DUP_SCAN_REPORT.replace('.txt', '_near.txt'))).write_text(nf.getvalue(), encoding="utf-8")
                 near_dup_summary = len(near_groups)
 
     print(f"Scansione completata. Gruppi duplicati: {groups_count}.")
@@ -637,7 +1633,8 @@ def scan_duplicates(base: Path, recursive: bool, prehash_bytes: int, enable_near
 
 # (1) Sidecar anche nella fase duplicati + (2) keeper exif
 
-def consolidate_duplicates(base: Path, dup_groups: Dict[str, List[Path]], mode: str, exiftool: Optional[str]):
+def consolidate_duplicates(base: Path, dup_groups: Dict[bytes, List[Path]], mode: str, exiftool: Optional[str],
+                           mtimes: Optional[Dict[str, float]] = None):
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S$")
     quarantine_root = base / f"_QuarantenaDuplicati_{timestamp}"
     if mode == "quarantine":
@@ -652,52 +1649,68 @@ def consolidate_duplicates(base: Path, dup_groups: Dict[str, List[Path]], mode:
 
     actions = []
     groups = sorted(dup_groups.items(), key=lambda x: -len(x[1]))
-    for i, (h, paths) in enumerate(groups, start=1):
-        if len(paths) < 2:
-            continue
-        keeper = choose_keeper(paths, exiftool)
-        print(f"[{i}/{len(groups)}] Keeper: {keeper}")
-        for p in paths:
-            if p == keeper:
+    # Contatore nomi per cartella di quarantena: ricorda l'ultimo suffisso
+    # assegnato per (stem, ext), così ogni collisione costa un probe solo
+    # invece del while exists() O(N) quando molti duplicati hanno lo stesso nome.
+    name_counters: Dict[Path, Dict[Tuple[str, str], int]] = defaultdict(dict)
+    with JsonlWriter(base / DUP_ACTIONS_JSONL) as jw:
+        for i, (h, paths) in enumerate(groups, start=1):
+            if len(paths) < 2:
                 continue
-            # (1) includi sidecar nella stessa azione
-            related = [p] + list(sidecars_for(p))
-            if mode == "quarantine":
-                target_dir = quarantine_root / h
-                target_dir.mkdir(parents=True, exist_ok=True)
-                for item in related:
-                    dest = target_dir / item.name
-                    if dest.exists():
-                        stem, ext = dest.stem, dest.suffix
-                        n = 2
-                        while (target_dir / f"{stem}_{n}{ext}").exists():
+            keeper = choose_keeper(paths, exiftool, mtimes)
+            print(f"[{i}/{len(groups)}] Keeper: {keeper}")
+            for p in paths:
+                if p == keeper:
+                    continue
+                # (1) includi sidecar nella stessa azione
+                related = [p] + list(sidecars_for(p))
+                if mode == "quarantine":
+                    target_dir = quarantine_root / h.hex()
+                    target_dir.mkdir(parents=True, exist_ok=True)
+                    for item in related:
+                        dest = target_dir / item.name
+                        ctr = name_counters[target_dir]
+                        key = (dest.stem, dest.suffix)
+                        n = ctr.get(key, 0)
+                        if n == 0 and dest.exists():
+                            n = 1
+                        if n == 0:
+                            ctr[key] = 1
+                        else:
+                            stem, ext = key
                             n += 1
-                        dest = target_dir / f"{stem}_{n}{ext}"
-                    try:
-                        shutil.move(str(item), str(dest))
-                        actions.append(("MOVED", str(item), str(dest)))
-                        print(f"    spostato -> {dest}")
-                        append_jsonl(base / DUP_ACTIONS_JSONL, {
-                            "action": "move",
-                            "source": str(item),
-                            "dest": str(dest),
-                            "group_sha1": h,
-                        })
-                    except Exception as e:
-                        print(f"    [ERRORE] Spostando {item}: {e}")
-            elif mode == "delete":
-                for item in related:
-                    try:
-                        os.remove(item)
-                        actions.append(("DELETED", str(item)))
-                        print(f"    eliminato -> {item}")
-                        append_jsonl(base / DUP_ACTIONS_JSONL, {
-                            "action": "delete",
-                            "source": str(item),
-                            "group_sha1": h,
-                        })
-                    except Exception as e:
-                        print(f"    [ERRORE] Eliminando {item}: {e}")
+                            while (target_dir / f"{stem}_{n}{ext}").exists():
+                                n += 1
+                            dest = target_dir / f"{stem}_{n}{ext}"
+                            ctr[key] = n
+                        try:
+                            move_path(item, dest)
+                            actions.append(("MOVED", str(item), str(dest)))
+                            print(f"    spostato -> {dest}")
+                            jw.write({
+                                "action": "move",
+                                "source": str(item),
+                                "dest": str(dest),
+                                "group_hash": h.hex(),
+                                "algo": HASH_ALGO,
+                            })
+                        except Exception as e:
+                            print(f"    [ERRORE] Spostando {item}: {e}")
+                elif mode == "delete":
+                    for item in related:
+                        try:
+                            os.remove(item)
+                            _dir_names_invalidate(str(item.parent))
+                            actions.append(("DELETED", str(item)))
+                            print(f"    eliminato -> {item}")
+                            jw.write({
+                                "action": "delete",
+                                "source": str(item),
+                                "group_hash": h.hex(),
+                                "algo": HASH_ALGO,
+                            })
+                        except Exception as e:
+                            print(f"    [ERRORE] Eliminando {item}: {e}")
 
     with (base / DUP_ACTION_LOG).open("a", encoding="utf-8") as f:
         f.write(f"Azione duplicati — {datetime.now().isoformat()}  mode={mode}\n")
@@ -723,9 +1736,20 @@ def load_checkpoint(base: Path) -> Optional[dict]:
     return None
 
 
-def save_checkpoint(base: Path, data: dict):
+def save_checkpoint(base: Path, data: dict, durable: bool = False):
+    """Scrittura atomica: tmp nella stessa directory + os.replace, così una
+    interruzione a metà write non lascia mai un checkpoint troncato.
+    fsync solo su durable=True (interruzione o fine run): nelle scritture
+    coalescenti di routine il costo del sync non vale la garanzia extra."""
+    target = base / CHECKPOINT_FILE
+    tmp = f"{target}.tmp"
     try:
-        (base / CHECKPOINT_FILE).write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(json.dumps(data, ensure_ascii=False, separators=(",", ":")))
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp, target)
     except Exception:
         pass
 
@@ -735,9 +1759,15 @@ def save_checkpoint(base: Path, data: dict):
 # ----------------------------
 
 def main():
-    global NORMALIZE_TO_LOCAL, NORMALIZE_TO_UTC, BATCH_EXIF_SIZE, PARTIAL_HASH_BYTES, USE_SHELL_FALLBACK, QUICKTIME_UTC
+    global NORMALIZE_TO_LOCAL, NORMALIZE_TO_UTC, BATCH_EXIF_SIZE, PARTIAL_HASH_BYTES, USE_SHELL_FALLBACK, QUICKTIME_UTC, QUIET, FFPROBE_WORKERS, EXIF_WORKERS
 
     args = parse_args()
+    if args.quiet:
+        QUIET = True
+    if args.ffprobe_workers > 0:
+        FFPROBE_WORKERS = args.ffprobe_workers
+    if args.exif_workers > 0:
+        EXIF_WORKERS = args.exif_workers
     if args.no_local_tz:
         NORMALIZE_TO_LOCAL = False
     if args.utc:
@@ -752,9 +1782,12 @@ def main():
 
     base = Path(__file__).resolve().parent
     exiftool = get_exiftool_path(base)
+    load_exif_date_cache(base)
 
     print(f"Cartella di lavoro: {base}")
     if exiftool:
+        global EXIF_CONFIG_PATH
+        EXIF_CONFIG_PATH = ensure_pickeddate_config(base)
         ver = exiftool_version(exiftool) or "sconosciuta"
         print(f"exiftool: trovato -> {exiftool} (ver: {ver})")
     else:
@@ -765,20 +1798,24 @@ def main():
     if dup == "s":
         rec = input("Includere anche le SOTTOCARTELLE (ricorsivo)? [S/n]: ").strip().lower()
         recursive = (rec != "n")
-        dup_groups, _, _ = find_duplicate_groups(base, recursive, PARTIAL_HASH_BYTES)
+        scan_result = find_duplicate_groups(base, recursive, PARTIAL_HASH_BYTES)
+        dup_groups, _, _, dup_mtimes, _, _ = scan_result
         if dup_groups:
-            _ = scan_duplicates(base, recursive, PARTIAL_HASH_BYTES, enable_near_dup=(not args.disable_near_dup))
+            _ = scan_duplicates(base, recursive, PARTIAL_HASH_BYTES,
+                                enable_near_dup=(not args.disable_near_dup),
+                                precomputed=scan_result)
             fix = input("Vuoi RISOLVERE i duplicati adesso lasciandone uno solo? [s/N]: ").strip().lower()
             if fix == "s":
                 mode = input("Come procedo? [1 = sposta in QUARANTENA (consigliato), 2 = ELIMINA definitivamente]: ").strip()
                 mode = "delete" if mode == "2" else "quarantine"
                 print("ATTENZIONE: l'operazione è potenzialmente distruttiva. Continua? [s/N]: ", end="")
                 if input().strip().lower() == "s":
-                    consolidate_duplicates(base, dup_groups, mode=mode, exiftool=exiftool)
+                    consolidate_duplicates(base, dup_groups, mode=mode, exiftool=exiftool, mtimes=dup_mtimes)
                 else:
                     print("Annullato su richiesta utente.")
         else:
             print("Nessun duplicato trovato.")
+        save_exif_date_cache(base)
         print("\nFINE scansione/risoluzione duplicati. Esco.")
         return 0
 
@@ -800,13 +1837,34 @@ def main():
     # Prescan ottimizzato
     print("Preparazione elenco files…")
     if batch_size:
-        smallest = nsmallest(batch_size, iter_candidates_fast(base), key=lambda t: t[0])
-        candidates = [p for _, p in smallest]
+        if np is not None and batch_size > 1000:
+            # batch grandi: argpartition è O(N) contro l'O(N log k) dell'heap,
+            # e materializzare le coppie una volta sola si ripaga
+            pairs = list(iter_candidates_fast(base))
+            k = min(batch_size, len(pairs))
+            if k:
+                mtimes = np.fromiter((m for m, _ in pairs), dtype=np.int64, count=len(pairs))
+                idx = np.argpartition(mtimes, k - 1)[:k]
+                idx = idx[np.argsort(mtimes[idx], kind="stable")]
+                candidates = [Path(pairs[i][1]) for i in idx]
+            else:
+                candidates = []
+        else:
+            # batch piccoli: heap limitato a k elementi, memoria O(k) anche su
+            # alberi da milioni di file (nsmallest scarta in C, senza key= la
+            # tupla (mtime_ns, path) si confronta sull'int al primo elemento)
+            smallest = nsmallest(batch_size, iter_candidates_fast(base))
+            candidates = [Path(p) for _, p in smallest]
         print(f"Limiterò il lavoro a {len(candidates)} file in questo batch (selezione rapida).")
     else:
         tmp = list(iter_candidates_fast(base))
-        tmp.sort(key=lambda t: t[0])
-        candidates = [p for _, p in tmp]
+        if np is not None and tmp:
+            mtimes = np.fromiter((m for m, _ in tmp), dtype=np.int64, count=len(tmp))
+            order = np.argsort(mtimes, kind="stable")
+            candidates = [Path(tmp[i][1]) for i in order]
+        else:
+            tmp.sort()
+            candidates = [Path(p) for _, p in tmp]
         print(f"Trovati {len(candidates)} file candidati. Elenco preparato.")
 
     # Carica checkpoint?
@@ -816,90 +1874,225 @@ def main():
         print(f"Checkpoint trovato: riprendo da indice {cp['last_index']+1}/{len(candidates)}")
         start_index = min(max(0, int(cp["last_index"]) + 1), len(candidates))
 
-    # Lettura EXIF in batch per i candidati
-    exif_map = exif_dates_batch(exiftool, candidates, BATCH_EXIF_SIZE) if exiftool else {}
+    # Pipeline EXIF → move: un thread in background legge i metadati del chunk
+    # successivo mentre il loop principale sposta quello corrente. exiftool è
+    # un processo esterno: il suo wall time si sovrappone ai syscall di move.
+    work = candidates[start_index:]
+    exif_chunk = max(1, BATCH_EXIF_SIZE) * 4
+    exif_queue: queue.Queue = queue.Queue(maxsize=2)
+
+    # Un errore del producer non deve sembrare una fine lavoro regolare:
+    # il main lo controlla e in quel caso NON scrive il checkpoint "run
+    # completato" (che salterebbe per sempre i file mai processati).
+    producer_error: List[BaseException] = []
+
+    def _exif_producer():
+        try:
+            # primo chunk piccolo (un solo batch exiftool): il primo move
+            # parte dopo ~BATCH_EXIF_SIZE file invece di aspettarne 4×
+            i = 0
+            size = max(1, BATCH_EXIF_SIZE)
+            while i < len(work):
+                chunk = work[i:i + size]
+                emap = exif_dates_batch(exiftool, chunk, BATCH_EXIF_SIZE) if exiftool else {}
+                exif_queue.put((chunk, emap))
+                i += size
+                size = exif_chunk
+        except Exception as e:
+            producer_error.append(e)
+        finally:
+            exif_queue.put(None)
+
+    threading.Thread(target=_exif_producer, daemon=True).start()
 
     moved = 0
     skipped_dup = 0
     conflicts = 0
 
+    # Cache delle destinazioni: migliaia di file finiscono in poche decine di
+    # bucket YYYY/MM, quindi f-string, join dei Path e mkdir(exist_ok=True) si
+    # pagano una volta per bucket invece che una volta per file.
+    dest_dir_cache: Dict[Tuple[int, int], Tuple[Path, str, str, str]] = {}
+
+    # Checkpoint coalescente: una write JSON per file dominava il loop una
+    # volta batchato l'EXIF; scriviamo ogni CHECKPOINT_EVERY file o
+    # CHECKPOINT_SECS secondi, sempre su interruzione e a fine run.
+    last_ckpt = time.monotonic()
+
+    def maybe_checkpoint(force: bool = False):
+        # Scrive SEMPRE completed_idx, mai il cursore di partizione idx: idx
+        # avanza mentre il chunk viene ancora smistato/lavorato dagli shard,
+        # un checkpoint basato su idx dichiarerebbe completati file mai
+        # processati (e un resume li salterebbe per sempre).
+        nonlocal last_ckpt
+        now = time.monotonic()
+        if not force and (completed_idx % CHECKPOINT_EVERY) != 0 and (now - last_ckpt) < CHECKPOINT_SECS:
+            return
+        last_ckpt = now
+        save_checkpoint(base, {"last_index": completed_idx - 1, "moved": moved, "duplicati": skipped_dup, "conflicts": conflicts},
+                        durable=force)
+
+    interrupted = False
+    counters_lock = threading.Lock()
+    move_workers = min(8, os.cpu_count() or 1)
+
+    # Probe one-shot: se nella cartella sorgente non c'è nemmeno un sidecar
+    # (caso comune), l'intero blocco sidecar si salta per tutto il run.
+    # Il listing arriva dalla cache directory, costa una scandir al massimo.
+    sidecar_ext = SIDECAR_EXT
+    have_sidecars = any(_ext_lower(n) in sidecar_ext for n in _dir_names(str(base)))
+
+    def _check_existing(src: Path, dest_file_s: str, year: str, month: str) -> bool:
+        """Destinazione già occupata: cascata di confronti e conteggio
+        dup/conflitto. True se il chiamante deve fermarsi qui."""
+        nonlocal skipped_dup, conflicts
+        if not os.path.exists(dest_file_s):
+            return False
+        name = src.name  # .name ricostruisce la stringa ad ogni accesso
+        # Confronto a cascata: dimensioni diverse = sicuramente diversi
+        # (zero letture); poi testa+coda, testa da 4MB; hash completo
+        # solo se serve.
+        try:
+            src_size = src.stat().st_size
+            same = src_size == os.stat(dest_file_s).st_size
+            if same and src_size > 2 * HEAD_TAIL_BYTES:
+                # prefiltro economico: 128KB letti contro MB interi
+                ha, hb = _pair_hash(file_fingerprint_head_tail, src, dest_file_s)
+                same = ha == hb
+            if same and src_size > PARTIAL_HASH_BYTES:
+                ha, hb = _pair_hash(file_fingerprint_head, src, dest_file_s, PARTIAL_HASH_BYTES)
+                same = ha == hb
+            if same:
+                ha, hb = _pair_hash(file_fingerprint_cached, src, dest_file_s)
+                same = ha == hb
+        except Exception as e:
+            log_line(f"[ERRORE] Hash su {name}: {e}")
+            with counters_lock:
+                conflicts += 1
+            return True
+
+        if same:
+            log_line(f"[DUP] {name} identico già in {year}/{month}. Segnato in {REPORT_FILE}.", per_file=True)
+            append_report_line(base, src, Path(dest_file_s), dry_run)
+            with counters_lock:
+                skipped_dup += 1
+        else:
+            log_line(f"[CONFLITTO] {name} esiste già in {year}/{month} ma è diverso. Non sposto.")
+            with counters_lock:
+                conflicts += 1
+        return True
+
+    # Corpo per-file specializzato una volta sola su dry_run: il ramo morto
+    # (move+sidecar o simulazione) sparisce dal loop invece di essere
+    # rivalutato per ogni file.
+    def _process_entry_dry(i: int, src: Path, dest_dir: Path, year: str, month: str, dest_dir_s: str):
+        name = src.name
+        log_line(f"[{i}/{total}] {name}", per_file=True)
+        if _check_existing(src, dest_dir_s + os.sep + name, year, month):
+            return
+        log_line(f"[SIMULA] Sposterei {name} -> {year}/{month}/", per_file=True)
+
+    def _process_entry_real(i: int, src: Path, dest_dir: Path, year: str, month: str, dest_dir_s: str):
+        """Gira in un worker per shard (anno, mese): mai due rename
+        concorrenti sulla stessa directory. Contatori sotto lock."""
+        nonlocal moved, conflicts
+        name = src.name
+        dest_file_s = dest_dir_s + os.sep + name
+        log_line(f"[{i}/{total}] {name}", per_file=True)
+        if _check_existing(src, dest_file_s, year, month):
+            return
+        try:
+            move_path(src, dest_file_s)
+            # stringa composta dai pezzi già noti: relative_to rifarebbe
+            # parsing e allocazioni per lo stesso risultato
+            log_line(f"[SPOSTATO] {year}/{month}/{name}", per_file=True)
+        except Exception as e:
+            log_line(f"[ERRORE] Spostando {name}: {e}")
+            return
+        # (4) sidecar accanto al file (saltato in blocco se il probe
+        # iniziale non ne ha trovati: non possono apparire durante il run)
+        sc_conflicts = process_sidecars(src, dest_dir) if have_sidecars else 0
+        with counters_lock:
+            moved += 1
+            conflicts += sc_conflicts
+
+    process_entry = _process_entry_dry if dry_run else _process_entry_real
+
+    def _run_shard(items):
+        for it in items:
+            process_entry(*it)
+
     try:
         total = len(candidates)
-        for idx, src in enumerate(candidates[start_index:], start=start_index + 1):
-            taken = get_taken_datetime(src, exiftool, premap=exif_map)
-            year = f"{taken.year:04d}"
-            month = f"{taken.month:02d}"
-            dest_dir = base / year / month
-            ensure_dir(dest_dir, dry_run)
-            dest_file = dest_dir / src.name
-
-            print(f"[{idx}/{total}] {src.name}")
-
-            if dest_file.exists():
-                try:
-                    src_hash = file_sha1(src)
-                    dst_hash = file_sha1(dest_file)
-                except Exception as e:
-                    print(f"[ERRORE] Hash su {src.name}: {e}")
-                    conflicts += 1
-                    save_checkpoint(base, {"last_index": idx-1, "moved": moved, "duplicati": skipped_dup, "conflicts": conflicts})
-                    continue
-
-                if src_hash == dst_hash:
-                    print(f"[DUP] {src.name} identico già in {year}/{month}. Segnato in {REPORT_FILE}.")
-                    append_report_line(base, src, dest_file, dry_run)
-                    skipped_dup += 1
-                    save_checkpoint(base, {"last_index": idx-1, "moved": moved, "duplicati": skipped_dup, "conflicts": conflicts})
-                    continue
-                else:
-                    print(f"[CONFLITTO] {src.name} esiste già in {year}/{month} ma è diverso. Non sposto.")
-                    conflicts += 1
-                    save_checkpoint(base, {"last_index": idx-1, "moved": moved, "duplicati": skipped_dup, "conflicts": conflicts})
-                    continue
-
-            if dry_run:
-                print(f"[SIMULA] Sposterei {src.name} -> {year}/{month}/")
+        idx = start_index            # cursore di partizione (file smistati)
+        completed_idx = start_index  # file effettivamente processati dagli shard
+        while True:
+            item = exif_queue.get()
+            if item is None:
+                break
+            chunk, exif_map = item
+            # Partizione per bucket destinazione (seriale, riempie la cache):
+            # le date arrivano già dal premap, resta lavoro su stringhe.
+            shards: Dict[Tuple[int, int], List[Tuple[int, Path, Path, str, str]]] = defaultdict(list)
+            for src in chunk:
+                idx += 1
+                taken = get_taken_datetime(src, exiftool, premap=exif_map)
+                key = (taken.year, taken.month)
+                bucket = dest_dir_cache.get(key)
+                if bucket is None:
+                    year = f"{taken.year:04d}"
+                    month = f"{taken.month:02d}"
+                    dest_dir = base / year / month
+                    ensure_dir(dest_dir, dry_run)
+                    # anche la forma stringa: nel loop caldo i path restano
+                    # stringhe (concatenazione contro costruzione di Path)
+                    bucket = (dest_dir, year, month, os.fspath(dest_dir))
+                    dest_dir_cache[key] = bucket
+                shards[key].append((idx, src) + bucket)
+            # Un worker per shard: rename e hash di bucket diversi si
+            # sovrappongono (os.rename rilascia il GIL), dentro lo stesso
+            # bucket l'ordine resta seriale.
+            if move_workers <= 1 or len(shards) <= 1:
+                for items in shards.values():
+                    _run_shard(items)
             else:
+                ex = ThreadPoolExecutor(max_workers=min(move_workers, len(shards)))
                 try:
-                    shutil.move(str(src), str(dest_file))
-                    moved += 1
-                    print(f"[SPOSTATO] {dest_file.relative_to(base)}")
-                except Exception as e:
-                    print(f"[ERRORE] Spostando {src.name}: {e}")
-                    save_checkpoint(base, {"last_index": idx-1, "moved": moved, "duplicati": skipped_dup, "conflicts": conflicts})
-                    continue
-
-                # (4) sidecar accanto al file
-                for sc in sidecars_for(dest_file):
-                    sc_src = src.parent / sc.name  # sidecar originale accanto a src
-                    sc_dest = dest_dir / sc.name
-                    if sc_dest.exists():
-                        try:
-                            if sc_src.exists() and file_sha1(sc_src) == file_sha1(sc_dest):
-                                print(f"         (sidecar) {sc.name} già presente (identico). Salto.")
-                            else:
-                                print(f"         (sidecar) CONFLITTO {sc.name} già presente ma diverso. Non sposto.")
-                                conflicts += 1
-                        except Exception:
-                            conflicts += 1
-                    else:
-                        try:
-                            if sc_src.exists():
-                                shutil.move(str(sc_src), str(sc_dest))
-                                print(f"         (sidecar) spostato {sc.name}")
-                        except Exception as e:
-                            print(f"         (sidecar) ERRORE spostando {sc.name}: {e}")
-            # salva checkpoint ad ogni iterazione
-            save_checkpoint(base, {"last_index": idx-1, "moved": moved, "duplicati": skipped_dup, "conflicts": conflicts})
+                    for fut in [ex.submit(_run_shard, items) for items in shards.values()]:
+                        fut.result()
+                except BaseException:
+                    # interruzione: scarta gli shard non ancora partiti invece
+                    # di drenarli (quelli in volo finiscono comunque)
+                    ex.shutdown(wait=True, cancel_futures=True)
+                    raise
+                ex.shutdown(wait=True)
+            # fine chunk: solo ora gli indici fino a idx sono stati processati
+            completed_idx = idx
+            maybe_checkpoint()
     except KeyboardInterrupt:
+        interrupted = True
+        maybe_checkpoint(force=True)
         print("\n[INTERRUZIONE] Esecuzione interrotta dall'utente. Riepilogo parziale sotto.")
 
+    if producer_error:
+        # stessa semantica dell'interruzione: progresso reale su disco,
+        # niente checkpoint di fine run
+        interrupted = True
+        maybe_checkpoint(force=True)
+        print(f"\n[ERRORE] Lettura metadati interrotta da un errore: {producer_error[0]}")
+        print("I file non processati restano in sorgente; rilancia per riprendere.")
+
+    flush_log()
     print("\n--- Riepilogo ---")
     print(f"Spostati   : {moved}")
     print(f"Duplicati  : {skipped_dup} (vedi {REPORT_FILE} se > 0)")
     print(f"Conflitti  : {conflicts}")
-    # checkpoint finale
-    save_checkpoint(base, {"last_index": len(candidates)-1, "moved": moved, "duplicati": skipped_dup, "conflicts": conflicts})
+    # checkpoint finale (su interruzione l'ha già scritto il force qui sopra,
+    # con l'indice reale: non marcare il run come completato)
+    if not interrupted:
+        save_checkpoint(base, {"last_index": len(candidates)-1, "moved": moved, "duplicati": skipped_dup, "conflicts": conflicts},
+                        durable=True)
+    save_exif_date_cache(base)
 
     return 0
 
@@ -907,17 +2100,20 @@ def main():
 def iter_candidates_fast(folder: Path):
     with os.scandir(folder) as it:
         for entry in it:
-            if not entry.is_file(follow_symlinks=False):
+            # estensione prima di is_file: confronto su stringa già in memoria
+            # contro un possibile stat, scarta subito i non-media
+            if _ext_lower(entry.name) not in ALL_EXT:
                 continue
-            name = entry.name
-            _, ext = os.path.splitext(name)
-            if ext.lower() not in ALL_EXT:
+            if not entry.is_file(follow_symlinks=False):
                 continue
             try:
-                mtime = entry.stat(follow_symlinks=False).st_mtime
+                # ns interi: confronti più rapidi dei float e niente perdita
+                # di precisione sui filesystem moderni
+                mtime = entry.stat(follow_symlinks=False).st_mtime_ns
             except Exception:
                 continue
-            yield (mtime, Path(folder / name))
+            # stringa dal DirEntry: il Path si crea solo per i file selezionati
+            yield (mtime, entry.path)
 
 
 if __name__ == "__main__":
@@ -928,3 +2124,5 @@ if __name__ == "__main__":
     except Exception as e:
         print(f"[FATALE] {e}")
         sys.exit(1)
+    finally:
+        _close_exiftool_daemon()